@@ -11,6 +11,7 @@ Usage:
 
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 import uiautomator2 as u2
 
 if len(sys.argv) != 2:
@@ -23,19 +24,26 @@ filename = sys.argv[1]
 os.makedirs("xmls", exist_ok=True)
 os.makedirs("screenshots", exist_ok=True)
 
-# Connect to device and capture both XML and screenshot
-d = u2.connect()
-xml = d.dump_hierarchy()
-
-# Save XML to xmls/<filename>
+# Output paths: xmls/<filename>.xml and screenshots/<filename>.png
+# (replace .xml with .png if needed)
 xml_output_path = os.path.join("xmls", f"{filename}.xml")
-with open(xml_output_path, "w", encoding="utf-8") as f:
-    f.write(xml)
-
-# Save screenshot to screenshots/<filename> (replace .xml with .png if needed)
 screenshot_filename = filename.rsplit('.', 1)[0] + '.png' if '.' in filename else filename + '.png'
 screenshot_output_path = os.path.join("screenshots", screenshot_filename)
-d.screenshot(screenshot_output_path)
+
+# Connect to device and capture both XML and screenshot. Each capture is a
+# separate device round trip, so the screenshot runs in a worker thread while
+# the hierarchy is dumped and written here.
+d = u2.connect()
+with ThreadPoolExecutor(max_workers=1) as pool:
+    screenshot_future = pool.submit(d.screenshot, screenshot_output_path)
+    xml = d.dump_hierarchy()
+
+    # Save XML to xmls/<filename>
+    with open(xml_output_path, "wb") as f:
+        f.write(xml.encode("utf-8"))
+
+    # Wait for the screenshot to be saved to screenshots/<filename>
+    screenshot_future.result()
 
 print(f"XML dump saved to {xml_output_path}")
 print(f"Screenshot saved to {screenshot_output_path}")
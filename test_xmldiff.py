@@ -0,0 +1,140 @@
+"""
+Tests for xmldiff.py.
+
+Run with:
+    python -m pytest -q
+"""
+
+import itertools
+import random
+
+import xmldiff
+
+
+def brute_force_best(scores):
+    """Maximum total score over all one-to-one row/column assignments."""
+    n = len(scores)
+    m = len(scores[0])
+    if n <= m:
+        return max(sum(scores[i][p[i]] for i in range(n)) for p in itertools.permutations(range(m), n))
+    return max(sum(scores[p[j]][j] for j in range(m)) for p in itertools.permutations(range(n), m))
+
+
+def make_node(idx, content, cls="android.widget.TextView"):
+    return xmldiff.Node(None, cls, content, "", None, {}, idx, "node", None, idx)
+
+
+def test_best_assignment_matches_brute_force():
+    rng = random.Random(0)
+    for _ in range(2000):
+        n = rng.randint(1, 5)
+        m = rng.randint(1, 5)
+        scale = rng.choice([10, 1_000_000, 10 ** 15])
+        scores = [[rng.choice([0, rng.randint(0, scale)]) for _ in range(m)] for _ in range(n)]
+        result = xmldiff.best_assignment(scores)
+
+        assert len(result) == min(n, m)
+        assert len({r for r, _ in result}) == len(result)
+        assert len({c for _, c in result}) == len(result)
+        assert sum(scores[r][c] for r, c in result) == brute_force_best(scores)
+
+
+def test_best_assignment_empty():
+    assert xmldiff.best_assignment([]) == []
+    assert xmldiff.best_assignment([[], []]) == []
+
+
+def test_match_remaining_optimal_beats_greedy():
+    # greedily, "red gree" would take "red green" and leave "red green" to
+    # settle for "red"; the optimal assignment pairs the identical strings
+    base = [make_node(0, "red gree"), make_node(1, "red green")]
+    inp = [make_node(0, "red green"), make_node(1, "red")]
+    pairs = xmldiff.match_remaining(base, inp, set())
+    assert [(a.content, b.content) for a, b in pairs] == [("red gree", "red"), ("red green", "red green")]
+
+
+def test_match_remaining_ties_keep_closest_bounds():
+    # no boxes overlap, so every pair scores the same and only the
+    # tie-break can pair each node with the one just below it
+    base = [make_node(i, "") for i in range(3)]
+    inp = [make_node(i, "") for i in range(3)]
+    for node, y in zip(base, [0, 100, 200]):
+        node.bounds = (0, y, 100, y + 10)
+    for node, y in zip(inp, [220, 20, 120]):
+        node.bounds = (0, y, 100, y + 10)
+    pairs = xmldiff.match_remaining(base, inp, set())
+    assert [(a.bounds[1], b.bounds[1]) for a, b in pairs] == [(0, 20), (100, 120), (200, 220)]
+
+
+def test_match_remaining_greedy_above_bucket_cap(monkeypatch):
+    monkeypatch.setattr(xmldiff, "OPTIMAL_MATCH_MAX_BUCKET", 1)
+    base = [make_node(0, "red gree"), make_node(1, "red green")]
+    inp = [make_node(0, "red green"), make_node(1, "red")]
+    pairs = xmldiff.match_remaining(base, inp, set())
+    assert [(a.content, b.content) for a, b in pairs] == [("red gree", "red green"), ("red green", "red")]
+
+
+def test_match_remaining_reports_unmatched():
+    base = [make_node(0, "wifi"), make_node(1, "battery", cls="android.widget.Switch")]
+    inp = [make_node(0, "wifi"), make_node(1, "zzzzzzzz")]
+    pairs = xmldiff.match_remaining(base, inp, set())
+    assert [(a and a.content, b and b.content) for a, b in pairs] == [
+        ("wifi", "wifi"), ("battery", None), (None, "zzzzzzzz")]
+
+
+def write_dump(path, nodes_xml):
+    path.write_text("<hierarchy rotation=\"0\">\n" + "\n".join(nodes_xml) + "\n</hierarchy>\n", encoding="utf-8")
+    return str(path)
+
+
+def run_main(monkeypatch, base, inp):
+    calls = []
+    compare_nodes = xmldiff.compare_nodes
+
+    def spy(pairs):
+        calls.append(pairs)
+        return compare_nodes(pairs)
+
+    monkeypatch.setattr(xmldiff, "compare_nodes", spy)
+    monkeypatch.setattr(xmldiff.sys, "argv", ["xmldiff.py", base, inp])
+    xmldiff.main()
+    return calls
+
+
+def test_content_only_change_is_compared(tmp_path, monkeypatch, capsys):
+    base = write_dump(tmp_path / "base.xml", [
+        '<node class="android.widget.TextView" contentDescription="Play" bounds="[0,0][100,50]" />',
+        '<node class="android.widget.TextView" contentDescription="Pause" bounds="[0,50][100,100]" />',
+    ])
+    inp = write_dump(tmp_path / "input.xml", [
+        '<node class="android.widget.TextView" contentDescription="Pause" bounds="[0,0][100,50]" />',
+        '<node class="android.widget.TextView" contentDescription="Play" bounds="[0,50][100,100]" />',
+    ])
+    assert not xmldiff.identical_dumps(xmldiff.collect_nodes(base), xmldiff.collect_nodes(inp))
+    assert run_main(monkeypatch, base, inp)
+    assert "no significant differences found" not in capsys.readouterr().out
+
+
+def test_identical_dumps_skip_matching(tmp_path, monkeypatch, capsys):
+    nodes = ['<node class="android.widget.TextView" content-desc="Play" bounds="[0,0][100,50]" />']
+    base = write_dump(tmp_path / "base.xml", nodes)
+    inp = write_dump(tmp_path / "input.xml", nodes)
+    assert run_main(monkeypatch, base, inp) == []
+    assert "no significant differences found" in capsys.readouterr().out
+
+
+def test_inserted_node_only_reports_addition(tmp_path, monkeypatch, capsys):
+    # identical empty containers tie on score; an insertion must not shift
+    # them onto their neighbours' bounds
+    children = [
+        '<node class="android.widget.FrameLayout" bounds="[0,{0}][1080,{1}]" />'.format(y, y + 120)
+        for y in range(200, 1400, 120)
+    ]
+    root = '<node class="android.widget.FrameLayout" bounds="[0,0][1080,2400]">'
+    base = write_dump(tmp_path / "base.xml", [root] + children + ["</node>"])
+    inp = write_dump(tmp_path / "input.xml", [
+        root, '<node class="android.widget.FrameLayout" bounds="[0,0][1080,120]" />'] + children + ["</node>"])
+    run_main(monkeypatch, base, inp)
+    out = capsys.readouterr().out
+    assert out.count('"type"') == 1
+    assert '"type": "added"' in out
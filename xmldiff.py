@@ -7,19 +7,51 @@ Usage:
     python android_xml_diff.py base.xml input.xml
 """
 
-import xml.etree.ElementTree as ET
+try:
+    # libxml2-backed parser; much faster and leaner on large UI dumps
+    import lxml.etree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET  # type: ignore[no-redef]
+import re
 import sys
 import difflib
+import functools
 import json
+from typing import TYPE_CHECKING, Optional, Union
+
+try:
+    # C++ normalized Indel similarity, 2 * LCS / (len(a) + len(b)); scores can
+    # differ from difflib's Ratcliff/Obershelp ratio used as the fallback
+    from rapidfuzz.distance import Indel
+except ImportError:
+    Indel = None  # type: ignore[assignment]
+
+try:
+    # Rust-implemented JSON encoder for large diff dumps
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    import xml.etree.ElementTree
+    import lxml.etree
+    # element type produced by whichever parser was imported as ET
+    Element = Union[xml.etree.ElementTree.Element, lxml.etree._Element]
 
 # Configuration: adjust to tune sensitivity
-KEY_ATTRS = ("resource-id", "content-desc", "class", "checked", "enabled",
-             "clickable", "focusable", "selected", "index", "package")
+KEY_ATTRS = frozenset(("resource-id", "content-desc", "class", "checked", "enabled",
+                       "clickable", "focusable", "selected", "index", "package"))
 IGNORE_PREFIXES = ("textSize", "textStyle", "textColor", "background", "alpha", "font")
 TEXT_SIMILARITY_THRESHOLD = 0.9
+# largest class bucket matched optimally; bigger buckets are matched greedily
+OPTIMAL_MATCH_MAX_BUCKET = 64
 
+Bounds = tuple[int, int, int, int]
 
-def normalize_text(s):
+_BOUNDS_RE = re.compile(r"\[(-?\d+),(-?\d+)\]\[(-?\d+),(-?\d+)\]")
+
+
+def normalize_text(s: Optional[str]) -> str:
     """
     Normalize text by removing extra whitespace and stripping leading/trailing spaces.
 
@@ -31,10 +63,10 @@ def normalize_text(s):
     """
     if not s:
         return ""
-    return " ".join(s.split()).strip()
+    return " ".join(s.split())
 
 
-def strip_ns(tag):
+def strip_ns(tag: str) -> str:
     """
     Strip XML namespace from tag name.
 
@@ -49,106 +81,215 @@ def strip_ns(tag):
     return tag
 
 
-def parse_xml(path):
+@functools.lru_cache(maxsize=4096)
+def parse_bounds(bounds_str: Optional[str]) -> Optional[Bounds]:
     """
-    Parse an XML file and return its root element.
+    Parse Android UI bounds string into coordinate tuple.
+
+    Results are cached per bounds string, so nodes with identical bounds skip
+    the regex and share one tuple.
 
     Args:
-        path: File path to the XML file
+        bounds_str: Bounds string in format "[x1,y1][x2,y2]"
 
     Returns:
-        Root element of the parsed XML tree
+        Tuple of (x1, y1, x2, y2) coordinates, or None if parsing fails
     """
-    return ET.parse(path).getroot()
+    if not bounds_str:
+        return None
+    m = _BOUNDS_RE.fullmatch(bounds_str)
+    if not m:
+        return None
+    return (int(m[1]), int(m[2]), int(m[3]), int(m[4]))
 
 
-def parse_bounds(bounds_str):
+def nonempty_box(bounds: Optional[Bounds]) -> Optional[Bounds]:
     """
-    Parse Android UI bounds string into coordinate tuple.
+    Return bounds only if they enclose a positive area.
 
     Args:
-        bounds_str: Bounds string in format "[x1,y1][x2,y2]"
+        bounds: Tuple of (x1, y1, x2, y2) coordinates, or None
 
     Returns:
-        Tuple of (x1, y1, x2, y2) coordinates, or None if parsing fails
+        The bounds tuple if x2 > x1 and y2 > y1, otherwise None
     """
-    if not bounds_str:
-        return None
-    try:
-        p = bounds_str.replace("][", " ").replace("[", "").replace("]", "").split()
-        x1, y1 = map(int, p[0].split(","))
-        x2, y2 = map(int, p[1].split(","))
-        return (x1, y1, x2, y2)
-    except Exception:
-        return None
+    if bounds and bounds[0] < bounds[2] and bounds[1] < bounds[3]:
+        return bounds
+    return None
 
 
-def node_info(elem, path):
+class Node:
+    """
+    Information extracted from a single UI element.
+
+    Uses __slots__ instead of a per-node dict to keep memory low on large dumps
+    and make field access cheap in the matching and comparison loops.
+
+    Attributes:
+        id: Resource ID, or None/empty if the element has none
+        cls: Class name of the element
+        content: Normalized content description
+        text: Normalized text
+        bounds: Tuple of (x1, y1, x2, y2) coordinates, or None
+        attrib: Filtered, non-cosmetic attributes
+        idx: Index of the node in document order, used as its identity
+        tag: Element tag name without namespace
+        parent: Parent Node, or None for the root
+        pos: Index of the element among its parent's children
+    """
+    __slots__ = ("id", "cls", "content", "text", "bounds", "attrib", "idx", "tag", "parent", "pos")
+
+    def __init__(self, id: Optional[str], cls: str, content: str, text: str,
+                 bounds: Optional[Bounds], attrib: dict[str, str], idx: int,
+                 tag: str, parent: Optional["Node"], pos: int) -> None:
+        self.id = id
+        self.cls = cls
+        self.content = content
+        self.text = text
+        self.bounds = bounds
+        self.attrib = attrib
+        self.idx = idx
+        self.tag = tag
+        self.parent = parent
+        self.pos = pos
+
+
+Pair = tuple[Optional[Node], Optional[Node]]
+
+
+def node_info(elem: "Element", idx: int, parent: Optional[Node], pos: int) -> Node:
     """
     Extract relevant information from an XML element node.
 
     Args:
         elem: XML element to extract information from
-        path: XPath-like string representing the element's position in the tree
+        idx: Index of the node in document order, used as its identity
+        parent: Node of the parent element, or None for the root
+        pos: Index of the element among its parent's children
 
     Returns:
-        Dictionary containing id, class, content, text, bounds, filtered attributes, path, and element reference
+        Node containing id, class, content, text, bounds, filtered attributes, index, and tree position
     """
-    attrib = dict(elem.attrib)
+    # lxml-stubs type attribute keys as str | bytes | QName; parsed dumps only yield str
+    attrib: dict[str, str] = dict(elem.attrib)  # type: ignore[arg-type]
     rid = attrib.get("resource-id") or attrib.get("resource_id") or attrib.get("id")
     content = normalize_text(attrib.get("content-desc") or attrib.get("content_desc") or attrib.get("contentDescription"))
     text = normalize_text(attrib.get("text"))
-    cls = attrib.get("class") or attrib.get("className") or strip_ns(elem.tag)
+    # ids, class names and state values like "true"/"false" repeat across the
+    # dump; interning makes them share one object and lets equality checks
+    # short-circuit on identity
+    if rid:
+        rid = sys.intern(rid)
+    tag = sys.intern(strip_ns(elem.tag))
+    cls = sys.intern(attrib.get("class") or attrib.get("className") or tag)
     bounds = parse_bounds(attrib.get("bounds"))
 
-    filtered = {}
+    filtered: dict[str, str] = {}
     for k, v in attrib.items():
         if k in KEY_ATTRS:
-            filtered[k] = v
-        elif not any(k.startswith(pref) for pref in IGNORE_PREFIXES):
+            filtered[k] = sys.intern(v)
+        elif not k.startswith(IGNORE_PREFIXES):
             # keep other small state-like attributes if present
             if k in ("checked", "enabled", "clickable", "selected", "focusable"):
-                filtered[k] = v
-
-    return {
-        "id": rid,
-        "class": cls,
-        "content": content,
-        "text": text,
-        "bounds": bounds,
-        "attrib": filtered,
-        "path": path,
-        "elem": elem
-    }
+                filtered[k] = sys.intern(v)
+
+    return Node(rid, cls, content, text, bounds, filtered, idx, tag, parent, pos)
 
 
-def collect_nodes(root):
+def collect_nodes(path: str) -> list[Node]:
     """
-    Recursively collect all nodes from an XML tree with path information.
+    Stream-parse an XML file and collect all nodes with path information.
+
+    Nodes are extracted as soon as their start tag is parsed and cleared once
+    their end tag is reached, so the full tree is never held in memory.
 
     Args:
-        root: Root element of the XML tree
+        path: File path to the XML file
 
     Returns:
-        List of node information dictionaries for all nodes in the tree
-    """
-    nodes = []
-    stack = [(root, "/" + strip_ns(root.tag) + "[0]")]
-    while stack:
-        elem, path = stack.pop()
-        nodes.append(node_info(elem, path))
-        children = list(elem)
-        for i, child in enumerate(reversed(children)):
-            idx = len(children) - 1 - i
-            child_path = f"{path}/{strip_ns(child.tag)}[{idx}]"
-            stack.append((child, child_path))
+        List of Node objects for all nodes in the tree
+    """
+    nodes: list[Node] = []
+    # open elements with their nodes, and how many children each has seen so far
+    stack: list[tuple["Element", Node]] = []
+    child_counts: list[int] = []
+    for event, elem in ET.iterparse(path, events=("start", "end")):
+        if event == "start":
+            if stack:
+                node = node_info(elem, len(nodes), stack[-1][1], child_counts[-1])
+                child_counts[-1] += 1
+            else:
+                node = node_info(elem, len(nodes), None, 0)
+            nodes.append(node)
+            stack.append((elem, node))
+            child_counts.append(0)
+        else:
+            stack.pop()
+            child_counts.pop()
+            elem.clear()
+            if stack:
+                # detach already-finished previous siblings from the parent
+                del stack[-1][0][:-1]
     return nodes
 
 
-def str_similarity(a, b):
+def node_path(node: Optional[Node]) -> str:
+    """
+    Build the XPath-like path of a node by walking up its parents.
+
+    Paths are only needed for nodes that end up in the diff output, so they
+    are materialized on demand instead of for every collected node.
+
+    Args:
+        node: Node to build the path for
+
+    Returns:
+        Path string such as "/hierarchy[0]/node[2]"
+    """
+    parts = []
+    while node is not None:
+        parts.append(f"{node.tag}[{node.pos}]")
+        node = node.parent
+    return "/" + "/".join(reversed(parts))
+
+
+def identical_dumps(base_nodes: list[Node], input_nodes: list[Node]) -> bool:
+    """
+    Check whether two collected dumps agree on every field the diff looks at.
+
+    Compares tree position, tag, class, id, content, text, bounds and filtered
+    attributes node by node in document order, stopping at the first
+    difference, so unchanged screens skip matching entirely while changed ones
+    pay almost nothing for the check.
+
+    Args:
+        base_nodes: List of Node objects from base XML
+        input_nodes: List of Node objects from input XML
+
+    Returns:
+        True if the dumps are identical in all compared fields, False otherwise
+    """
+    if len(base_nodes) != len(input_nodes):
+        return False
+    for a, b in zip(base_nodes, input_nodes):
+        a_parent = a.parent.idx if a.parent is not None else -1
+        b_parent = b.parent.idx if b.parent is not None else -1
+        if (a_parent != b_parent or a.pos != b.pos or a.tag != b.tag or a.cls != b.cls
+                or a.id != b.id or a.content != b.content or a.text != b.text
+                or a.bounds != b.bounds or a.attrib != b.attrib):
+            return False
+    return True
+
+
+def str_similarity(a: Optional[str], b: Optional[str]) -> float:
     """
     Calculate similarity ratio between two strings.
 
+    Uses the LCS-based Indel similarity from rapidfuzz when it is installed and
+    difflib's Ratcliff/Obershelp ratio otherwise. The two can give different
+    scores for the same pair, so matches and text_change decisions may depend
+    on whether rapidfuzz is available.
+
     Args:
         a: First string to compare
         b: Second string to compare
@@ -156,30 +297,169 @@ def str_similarity(a, b):
     Returns:
         Float between 0 and 1 representing similarity ratio (1.0 = identical)
     """
+    if a == b:
+        return 1.0
+    if Indel is not None:
+        return Indel.normalized_similarity(a or "", b or "")
     return difflib.SequenceMatcher(None, a or "", b or "").ratio()
 
 
-def match_by_resource_id(base_nodes, input_nodes, used_input):
+def similarity_upper_bound(a: Optional[str], b: Optional[str]) -> float:
+    """
+    Cheap upper bound on str_similarity computed from string lengths only.
+
+    The ratio is 2 * matches / (len(a) + len(b)) and there can be at most
+    min(len(a), len(b)) matches, so this never underestimates the real value.
+
+    Args:
+        a: First string to compare
+        b: Second string to compare
+
+    Returns:
+        Float between 0 and 1 that is >= str_similarity(a, b)
+    """
+    total = len(a or "") + len(b or "")
+    if total == 0:
+        return 1.0
+    return 2.0 * min(len(a or ""), len(b or "")) / total
+
+
+def bounds_distance(a: Optional[Bounds], b: Optional[Bounds]) -> int:
+    """
+    Sum of absolute coordinate differences between two bounds.
+
+    Args:
+        a: First bounds, or None
+        b: Second bounds, or None
+
+    Returns:
+        Distance in pixels; 0 when both are missing, -1 when only one is
+    """
+    if a is None or b is None:
+        return 0 if a is b else -1
+    return abs(a[0] - b[0]) + abs(a[1] - b[1]) + abs(a[2] - b[2]) + abs(a[3] - b[3])
+
+
+def tie_broken_weights(candidates: list[list[tuple[int, int, int, int]]], width: int) -> list[list[int]]:
+    """
+    Pack match scores and tie-breakers into integer assignment weights.
+
+    Weights order assignments by total score first, then by smaller total
+    bounds distance, then by smaller relative-position distance, so a swap
+    is only preferred when it strictly improves the score. Pairs without a
+    candidate entry get weight 0.
+
+    Args:
+        candidates: Per row, (column, score, bounds distance, position distance)
+            tuples as built by match_remaining; a bounds distance of -1 means
+            only one side has bounds and ranks last
+        width: Number of columns
+
+    Returns:
+        Weight matrix for best_assignment
+    """
+    max_dist = max((cand[2] for row in candidates for cand in row), default=0)
+    missing = max_dist + 1
+    # a tie-break total summed over any assignment stays below one score unit
+    max_tie = missing * 1001 + 1000
+    unit = (max_tie + 1) * (min(len(candidates), width) + 1)
+    weights = []
+    for row in candidates:
+        weight_row = [0] * width
+        for c, score, dist, pos in row:
+            tie = (dist if dist >= 0 else missing) * 1001 + pos
+            weight_row[c] = score * unit - tie
+        weights.append(weight_row)
+    return weights
+
+
+def best_assignment(scores: list[list[int]]) -> list[tuple[int, int]]:
+    """
+    Find the one-to-one row/column assignment with the maximum total score.
+
+    Hungarian algorithm with row/column potentials, O(n^2 * m) for an n x m
+    matrix with n <= m (wider-than-tall matrices are transposed first).
+    Scores are integers so the optimum is exact, which lets callers pack a
+    primary score and tie-breakers into one weight.
+
+    Args:
+        scores: Non-negative integer score matrix as a list of equally long rows
+
+    Returns:
+        List of (row, column) index pairs; every row of the smaller dimension is assigned
+    """
+    n = len(scores)
+    m = len(scores[0]) if n else 0
+    if n == 0 or m == 0:
+        return []
+    if n > m:
+        transposed = [list(col) for col in zip(*scores)]
+        return [(r, c) for c, r in best_assignment(transposed)]
+
+    # larger than any reduced cost the potentials can produce
+    inf = 4 * (n + m + 1) * (max(max(row) for row in scores) + 1)
+    u = [0] * (n + 1)
+    v = [0] * (m + 1)
+    p = [0] * (m + 1)  # p[j] = 1-based row assigned to column j, 0 if free
+    way = [0] * (m + 1)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = [inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            row = scores[i0 - 1]
+            delta = inf
+            j1 = 0
+            for j in range(1, m + 1):
+                if not used[j]:
+                    cur = -row[j - 1] - u[i0] - v[j]
+                    if cur < minv[j]:
+                        minv[j] = cur
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        # walk the augmenting path back to the root
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    return [(p[j] - 1, j - 1) for j in range(1, m + 1) if p[j]]
+
+
+def match_by_resource_id(base_nodes: list[Node], input_nodes: list[Node], used_input: set[int]) -> list[Pair]:
     """
     Match nodes between base and input trees by their resource IDs.
 
     Args:
-        base_nodes: List of node information dictionaries from base XML
-        input_nodes: List of node information dictionaries from input XML
+        base_nodes: List of Node objects from base XML
+        input_nodes: List of Node objects from input XML
         used_input: Set to track which input nodes have been matched
 
     Returns:
         List of (base_node, input_node) tuples representing matches
     """
-    matches = []
-    base_by_id = {}
-    input_by_id = {}
+    matches: list[Pair] = []
+    base_by_id: dict[str, list[Node]] = {}
+    input_by_id: dict[str, list[Node]] = {}
     for n in base_nodes:
-        if n["id"]:
-            base_by_id.setdefault(n["id"], []).append(n)
+        if n.id:
+            base_by_id.setdefault(n.id, []).append(n)
     for n in input_nodes:
-        if n["id"]:
-            input_by_id.setdefault(n["id"], []).append(n)
+        if n.id:
+            input_by_id.setdefault(n.id, []).append(n)
 
     for rid, base_group in base_by_id.items():
         input_group = input_by_id.get(rid, [])
@@ -188,77 +468,159 @@ def match_by_resource_id(base_nodes, input_nodes, used_input):
             a = base_group[i] if i < len(base_group) else None
             b = input_group[i] if i < len(input_group) else None
             if b:
-                used_input.add(id(b["elem"]))
+                used_input.add(b.idx)
             matches.append((a, b))
     return matches
 
 
-def match_remaining(base_nodes, input_nodes, used_input):
+def match_score(a_content: str, a_text: str, a_box: Optional[Bounds],
+                b_content: str, b_text: str, b_box: Optional[Bounds], floor: float) -> float:
+    """
+    Heuristic similarity score of two same-class nodes without resource IDs.
+
+    The score is the better of content similarity (weighted 1.2) and text
+    similarity, plus 0.05 if the two boxes overlap. Length-only upper bounds
+    are checked first so the string ratios are skipped for candidates that
+    cannot beat floor.
+
+    Args:
+        a_content: Normalized content description of the base node
+        a_text: Normalized text of the base node
+        a_box: Non-empty bounds of the base node (see nonempty_box), or None
+        b_content: Normalized content description of the input node
+        b_text: Normalized text of the input node
+        b_box: Non-empty bounds of the input node, or None
+        floor: Scores at or below this value are not needed by the caller
+
+    Returns:
+        The score, or 0.0 if it cannot exceed floor
+    """
+    bonus = 0.0
+    if a_box and b_box:
+        # two non-empty boxes overlap iff each starts before the other ends
+        ax1, ay1, ax2, ay2 = a_box
+        bx1, by1, bx2, by2 = b_box
+        if bx1 < ax2 and ax1 < bx2 and by1 < ay2 and ay1 < by2:
+            bonus = 0.05
+
+    text_ub = similarity_upper_bound(a_text, b_text)
+    if max(similarity_upper_bound(a_content, b_content) * 1.2, text_ub) + bonus <= floor:
+        return 0.0
+    score = str_similarity(a_content, b_content) * 1.2
+    if text_ub > score:
+        score = max(score, str_similarity(a_text, b_text))
+    return score + bonus
+
+
+def match_remaining(base_nodes: list[Node], input_nodes: list[Node], used_input: set[int]) -> list[Pair]:
     """
     Match remaining nodes without resource IDs using heuristic similarity scoring.
 
     Args:
-        base_nodes: List of node information dictionaries from base XML
-        input_nodes: List of node information dictionaries from input XML
-        used_input: Set of already matched input node element IDs
+        base_nodes: List of Node objects from base XML
+        input_nodes: List of Node objects from input XML
+        used_input: Set of already matched input node indices
 
     Returns:
         List of (base_node, input_node) tuples representing best matches and unmatched nodes
     """
-    base_noid = [n for n in base_nodes if not n["id"]]
-    input_noid = [n for n in input_nodes if not n["id"] and id(n["elem"]) not in used_input]
-    matches = []
-    unmatched_input = list(input_noid)
-
-    for a in base_noid:
-        best = None
-        best_score = 0.0
-        for b in unmatched_input:
-            if a["class"] != b["class"]:
+    base_noid = [n for n in base_nodes if not n.id]
+    input_noid = [n for n in input_nodes if not n.id and n.idx not in used_input]
+
+    # column-wise copies of the candidate fields so the inner loop indexes
+    # flat lists instead of doing several attribute lookups per pair
+    in_content = [b.content for b in input_noid]
+    in_text = [b.text for b in input_noid]
+    in_boxes = [nonempty_box(b.bounds) for b in input_noid]
+
+    # nodes only ever match within the same class, so bucket both sides by
+    # class and score each base node against its own bucket only
+    base_by_cls: dict[str, list[int]] = {}
+    for i, a in enumerate(base_noid):
+        base_by_cls.setdefault(a.cls, []).append(i)
+    input_by_cls: dict[str, list[int]] = {}
+    for j, b in enumerate(input_noid):
+        input_by_cls.setdefault(b.cls, []).append(j)
+
+    # small buckets get an optimal assignment; above the cap its O(n^2 * m)
+    # cost outweighs the gain, so fall back to greedy matching in base order
+    assigned: dict[int, int] = {}  # base_noid index -> input_noid index
+    taken = [False] * len(input_noid)
+    for cls, rows in base_by_cls.items():
+        cols = input_by_cls.get(cls)
+        if not cols:
+            continue
+        optimal = max(len(rows), len(cols)) <= OPTIMAL_MATCH_MAX_BUCKET
+
+        candidates: list[list[tuple[int, int, int, int]]] = []
+        for r, i in enumerate(rows):
+            a = base_noid[i]
+            a_content = a.content
+            a_text = a.text
+            a_box = nonempty_box(a.bounds)
+            if optimal:
+                # (score in millionths, bounds distance, position distance)
+                # for every pair above the match threshold
+                row = []
+                for c, j in enumerate(cols):
+                    score = match_score(a_content, a_text, a_box, in_content[j], in_text[j], in_boxes[j], 0.4)
+                    if score > 0.4:
+                        row.append((c, round(score * 1_000_000), bounds_distance(a.bounds, input_noid[j].bounds),
+                                    round(1000 * abs(r / len(rows) - c / len(cols)))))
+                candidates.append(row)
                 continue
-            score = max(str_similarity(a["content"], b["content"]) * 1.2,
-                        str_similarity(a["text"], b["text"]))
-            if a["bounds"] and b["bounds"]:
-                ax1, ay1, ax2, ay2 = a["bounds"]
-                bx1, by1, bx2, by2 = b["bounds"]
-                ix1, iy1 = max(ax1, bx1), max(ay1, by1)
-                ix2, iy2 = min(ax2, bx2), min(ay2, by2)
-                if ix2 > ix1 and iy2 > iy1:
-                    score += 0.05
-            if score > best_score:
-                best_score = score
-                best = b
-        if best and best_score > 0.4:
-            matches.append((a, best))
-            unmatched_input.remove(best)
-        else:
-            matches.append((a, None))
 
-    for b in unmatched_input:
-        matches.append((None, b))
+            best = -1
+            best_score = 0.0
+            for j in cols:
+                if taken[j]:
+                    continue
+                score = match_score(a_content, a_text, a_box, in_content[j], in_text[j], in_boxes[j],
+                                    max(best_score, 0.4))
+                if score > best_score:
+                    best_score = score
+                    best = j
+            if best >= 0 and best_score > 0.4:
+                assigned[i] = best
+                taken[best] = True
+
+        if optimal:
+            weights = tie_broken_weights(candidates, len(cols))
+            for r, c in best_assignment(weights):
+                if weights[r][c] > 0:
+                    assigned[rows[r]] = cols[c]
+                    taken[cols[c]] = True
+
+    matches: list[Pair] = []
+    for i, a in enumerate(base_noid):
+        k = assigned.get(i)
+        matches.append((a, input_noid[k] if k is not None else None))
+
+    for j, b in enumerate(input_noid):
+        if not taken[j]:
+            matches.append((None, b))
 
     return matches
 
 
-def significant_text_change(a_text, b_text):
+def significant_text_change(a_text: str, b_text: str) -> bool:
     """
     Determine if text change between two nodes is significant enough to report.
 
     Args:
-        a_text: Text content from base node
-        b_text: Text content from input node
+        a_text: Normalized text content from base node
+        b_text: Normalized text content from input node
 
     Returns:
         True if text change is significant (similarity below threshold), False otherwise
     """
-    a_norm = normalize_text(a_text)
-    b_norm = normalize_text(b_text)
-    if a_norm == b_norm:
+    # node_info already stores normalized text, so compare it as-is
+    if a_text == b_text:
         return False
-    return str_similarity(a_norm, b_norm) < TEXT_SIMILARITY_THRESHOLD
+    return str_similarity(a_text, b_text) < TEXT_SIMILARITY_THRESHOLD
 
 
-def compare_nodes(pairs):
+def compare_nodes(pairs: list[Pair]) -> list[dict]:
     """
     Compare matched node pairs and identify significant differences.
 
@@ -268,37 +630,50 @@ def compare_nodes(pairs):
     Returns:
         List of difference dictionaries describing added, removed, and changed nodes
     """
-    diffs = []
+    diffs: list[dict] = []
     for a, b in pairs:
-        if a is None and b is not None:
-            diffs.append({"type": "added", "path": b["path"], "class": b["class"], "id": b["id"], "text": b["text"]})
+        if a is None:
+            if b is not None:
+                diffs.append({"type": "added", "path": node_path(b), "class": b.cls, "id": b.id, "text": b.text})
             continue
-        if b is None and a is not None:
-            diffs.append({"type": "removed", "path": a["path"], "class": a["class"], "id": a["id"], "text": a["text"]})
-            continue
-        if a is None and b is None:
+        if b is None:
+            diffs.append({"type": "removed", "path": node_path(a), "class": a.cls, "id": a.id, "text": a.text})
             continue
 
+        # "path" is filled in below, only for pairs that produced a diff
+        cls = a.cls
+        first = len(diffs)
+
         # attribute differences
-        keys = set(a["attrib"].keys()) | set(b["attrib"].keys())
-        for k in sorted(keys):
-            va = a["attrib"].get(k)
-            vb = b["attrib"].get(k)
-            if va != vb:
-                diffs.append({"type": "attr_change", "path": a["path"], "class": a["class"], "attr": k, "from": va, "to": vb})
+        a_attrib = a.attrib
+        b_attrib = b.attrib
+        if a_attrib != b_attrib:
+            # symmetric difference of the item views leaves only keys whose
+            # value changed, appeared or disappeared
+            changed = {k for k, _ in a_attrib.items() ^ b_attrib.items()}
+            for k in sorted(changed):
+                diffs.append({"type": "attr_change", "path": None, "class": cls, "attr": k,
+                              "from": a_attrib.get(k), "to": b_attrib.get(k)})
 
         # text
-        if significant_text_change(a["text"], b["text"]):
-            diffs.append({"type": "text_change", "path": a["path"], "class": a["class"], "from": a["text"], "to": b["text"]})
+        if significant_text_change(a.text, b.text):
+            diffs.append({"type": "text_change", "path": None, "class": cls, "from": a.text, "to": b.text})
 
         # bounds
-        if a["bounds"] and b["bounds"] and a["bounds"] != b["bounds"]:
-            diffs.append({"type": "bounds_change", "path": a["path"], "class": a["class"], "from": a["bounds"], "to": b["bounds"]})
+        a_bounds = a.bounds
+        b_bounds = b.bounds
+        if a_bounds and b_bounds and a_bounds != b_bounds:
+            diffs.append({"type": "bounds_change", "path": None, "class": cls, "from": a_bounds, "to": b_bounds})
+
+        if len(diffs) > first:
+            path = node_path(a)
+            for d in diffs[first:]:
+                d["path"] = path
 
     return diffs
 
 
-def calculate_difference_score(diffs, total_nodes):
+def calculate_difference_score(diffs: list[dict], total_nodes: int) -> float:
     """
     Calculate a normalized difference score between 0 and 1.
 
@@ -329,7 +704,7 @@ def calculate_difference_score(diffs, total_nodes):
     return round(score, 4)
 
 
-def main():
+def main() -> None:
     """
     Main entry point for XML diff tool - compares two Android UI XML dumps.
 
@@ -342,22 +717,24 @@ def main():
     if len(sys.argv) != 3:
         print("usage: python xmldiff.py base.xml input.xml")
         return
-    base_root = parse_xml(sys.argv[1])
-    input_root = parse_xml(sys.argv[2])
+    base_nodes = collect_nodes(sys.argv[1])
+    input_nodes = collect_nodes(sys.argv[2])
 
-    base_nodes = collect_nodes(base_root)
-    input_nodes = collect_nodes(input_root)
-
-    used_input = set()
-    pairs = []
-    pairs.extend(match_by_resource_id(base_nodes, input_nodes, used_input))
-    pairs.extend(match_remaining(base_nodes, input_nodes, used_input))
-
-    diffs = compare_nodes(pairs)
+    if identical_dumps(base_nodes, input_nodes):
+        diffs: list[dict] = []
+    else:
+        used_input: set[int] = set()
+        pairs: list[Pair] = []
+        pairs.extend(match_by_resource_id(base_nodes, input_nodes, used_input))
+        pairs.extend(match_remaining(base_nodes, input_nodes, used_input))
+        diffs = compare_nodes(pairs)
     diff_score = calculate_difference_score(diffs, len(base_nodes))
 
     if not diffs:
         print("no significant differences found")
+    elif orjson is not None:
+        sys.stdout.flush()
+        sys.stdout.buffer.write(orjson.dumps(diffs, option=orjson.OPT_INDENT_2) + b"\n")
     else:
         print(json.dumps(diffs, indent=2, ensure_ascii=False))
     